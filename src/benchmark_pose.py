@@ -0,0 +1,94 @@
+"""
+Compares the crop-based pose path against the single-pass multi-pose engine on a recording.
+
+    python benchmark_pose.py session.mp4 --frames 300
+    python benchmark_pose.py session.bag
+
+YOLO runs once per frame and both engines get the same detections, so the table isolates pose
+cost by the number of wrestlers in frame. The crop path pays one Pose pass per wrestler while
+the multi-pose engine pays one larger full-frame pass, so the crossover depends on the hardware
+and crop sizes; the last column shows which engine to pick with POSE_ENGINE.
+"""
+import argparse
+import time
+import cv2
+import numpy as np
+import media_pipe_handler
+import wrestler_tracker
+from multi_pose_engine import MultiPoseEngine
+
+def read_frames(path, max_frames):
+    frames = []
+    if path.endswith(".bag"):
+        from camera_handler import create_playback_camera
+        # read_every_frame drains the recording synchronously so no frame is skipped
+        with create_playback_camera(path, repeat=False, real_time=False, read_every_frame=True) as camera:
+            while len(frames) < max_frames:
+                frame = camera.get_frame(timeout_ms=2000)
+                if frame is None:
+                    break
+                frames.append(frame)
+        return frames
+
+    capture = cv2.VideoCapture(path)
+    while len(frames) < max_frames:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    capture.release()
+    return frames
+
+def time_engine(process, frames, detections):
+    timings = []
+    for frame, people in zip(frames, detections):
+        start = time.perf_counter()
+        process(frame, people)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+def summarize(timings, counts, count):
+    selected = [t for t, c in zip(timings, counts) if c == count]
+    # skip the first frames of each group, which include graph start-up
+    steady = selected[3:] or selected
+    return np.mean(steady), np.percentile(steady, 95)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("recording", help="video file or RealSense .bag")
+    parser.add_argument("--frames", type=int, default=300)
+    args = parser.parse_args()
+
+    frames = read_frames(args.recording, args.frames)
+    if not frames:
+        print("No frames read from", args.recording)
+        return
+
+    wrestler_tracker.warm_up()
+    yolo_timings = []
+    detections = []
+    for frame in frames:
+        start = time.perf_counter()
+        detections.append(wrestler_tracker.detect_people(frame))
+        yolo_timings.append((time.perf_counter() - start) * 1000)
+    counts = [len(people) for people in detections]
+
+    # build the crop pool directly; warm_up() would pick the multi engine if POSE_ENGINE=multi is set
+    media_pipe_handler.warm_up_pose_pool()
+    crop_timings = time_engine(lambda frame, people: media_pipe_handler.process_wrestler_frames(people), frames, detections)
+
+    engine = MultiPoseEngine()
+    engine.warm_up()
+    multi_timings = time_engine(engine.process, frames, detections)
+    engine.close()
+
+    print(f"{len(frames)} frames, YOLO mean {np.mean(yolo_timings):.1f} ms")
+    print(f"{'wrestlers':>9} {'frames':>6} {'crop ms':>9} {'crop p95':>9} {'multi ms':>9} {'multi p95':>9}  faster")
+    for count in sorted(set(counts)):
+        crop_mean, crop_p95 = summarize(crop_timings, counts, count)
+        multi_mean, multi_p95 = summarize(multi_timings, counts, count)
+        faster = "multi" if multi_mean < crop_mean else "crop"
+        print(f"{count:>9} {counts.count(count):>6} {crop_mean:>9.1f} {crop_p95:>9.1f} {multi_mean:>9.1f} {multi_p95:>9.1f}  {faster}")
+
+if __name__ == "__main__":
+    main()
@@ -10,33 +10,77 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class RealSenseCamera:
-    def __init__(self, device_id: Optional[str] = None):
+    def __init__(self, device_id: Optional[str] = None, bag_file: Optional[str] = None):
         self._pipeline = None
         self._config = None
         self._device_id = device_id
+        self._bag_file = bag_file
         self._is_streaming = False
         self._lock = threading.Lock()
         
+        # Capture thread state; the SDK frame queue decouples delivery from the consumer's pace
+        self._queue = None
+        self._align = None
+        self._capture_thread = None
+        self._frame_condition = threading.Condition()
+        self._queue_depth = 2
+        self._enable_depth = False
+        
         self._latest_frame = None
+        self._latest_depth = None
         self._frame_timestamp = None
+        self._frame_metadata = None
+        self._frame_count = 0
+        self._dropped_frames = 0
+        self._overwritten_frames = 0
+        self._unread = False
+        self._last_frame_number = None
         self._width = 640
         self._height = 480
         self._fps = 30
         
+        # Playback options (only used with bag_file)
+        self._repeat_playback = True
+        self._real_time = True
+        self._read_every_frame = False
+        
         # MediaPipe compatibility
         self._flip_horizontal = False
         self._convert_bgr_to_rgb = True
         
         logger.info("RealSense camera manager initialized")
     
-    def configure_stream(self, resolution: Tuple[int, int] = (640, 480),fps: int = 30) -> None:
+    def configure_stream(self, resolution: Tuple[int, int] = (640, 480),fps: int = 30, queue_depth: int = 2, enable_depth: bool = False) -> None:
         if self._is_streaming:
             raise RuntimeError("Cannot configure stream while camera is streaming")
+        if queue_depth < 1:
+            raise ValueError("queue_depth must be at least 1")
         
         self._width, self._height = resolution
         self._fps = fps
+        self._queue_depth = queue_depth
+        self._enable_depth = enable_depth
+        
+        logger.info(f"Configured stream - Color: {resolution}@{fps}fps, Depth: {enable_depth}, Queue depth: {queue_depth}")
+    
+    def set_playback_options(self, repeat: bool = True, real_time: bool = True, read_every_frame: bool = False) -> None:
+        """
+        Options for .bag playback. With the default capture thread a slow consumer only sees
+        the newest frame; the rest count as dropped in get_stats(). real_time=False stops the
+        player from skipping ahead of the thread, but the frame queue still drops its oldest
+        frames when full. read_every_frame=True skips the capture thread and frame queue:
+        get_frame() pulls framesets synchronously with wait_for_frames, and together with
+        real_time=False the player waits for the consumer, so every recorded frame is read.
+        """
+        if self._is_streaming:
+            raise RuntimeError("Cannot configure playback while camera is streaming")
+        if read_every_frame and not self._bag_file:
+            raise ValueError("read_every_frame is only supported for .bag playback")
         
-        logger.info(f"Configured stream - Color: {resolution}@{fps}fps")
+        self._repeat_playback = repeat
+        self._real_time = real_time
+        self._read_every_frame = read_every_frame
+        logger.info(f"Playback options - Repeat: {repeat}, Real time: {real_time}, Read every frame: {read_every_frame}")
     
     def set_mediapipe_options(self, flip_horizontal: bool = False, convert_bgr_to_rgb: bool = True) -> None:
         self._flip_horizontal = flip_horizontal
@@ -48,17 +92,36 @@ class RealSenseCamera:
             self._pipeline = rs.pipeline()
             self._config = rs.config()
             
-            # Configure device if specified
-            if self._device_id:
-                self._config.enable_device(self._device_id)
+            if self._bag_file:
+                # Recorded streams are replayed as-is; resolution and format come from the file
+                self._config.enable_device_from_file(self._bag_file, repeat_playback=self._repeat_playback)
+                self._config.enable_stream(rs.stream.color)
+                if self._enable_depth:
+                    self._config.enable_stream(rs.stream.depth)
+            else:
+                # Configure device if specified
+                if self._device_id:
+                    self._config.enable_device(self._device_id)
+                
+                self._config.enable_stream(rs.stream.color, 
+                                         self._width, self._height, 
+                                         rs.format.bgr8, self._fps)
+                if self._enable_depth:
+                    self._config.enable_stream(rs.stream.depth,
+                                             self._width, self._height,
+                                             rs.format.z16, self._fps)
+            
+            self._align = rs.align(rs.stream.color) if self._enable_depth else None
             
-            # Configure color stream only
-            self._config.enable_stream(rs.stream.color, 
-                                     self._width, self._height, 
-                                     rs.format.bgr8, self._fps)
+            if self._read_every_frame:
+                profile = self._pipeline.start(self._config)
+            else:
+                # keep_frames lets the capture thread hold the latest frameset without stalling the SDK pool
+                self._queue = rs.frame_queue(self._queue_depth, keep_frames=True)
+                profile = self._pipeline.start(self._config, self._queue)
             
-            # Test configuration
-            profile = self._pipeline.start(self._config)
+            if self._bag_file:
+                profile.get_device().as_playback().set_real_time(self._real_time)
             
             logger.info("Pipeline initialized successfully")
             return True
@@ -78,6 +141,8 @@ class RealSenseCamera:
             finally:
                 self._pipeline = None
                 self._config = None
+                self._queue = None
+                self._align = None
     
     def start(self) -> bool:
         with self._lock:
@@ -88,7 +153,15 @@ class RealSenseCamera:
             if not self._initialize_pipeline():
                 return False
             
+            self._frame_count = 0
+            self._dropped_frames = 0
+            self._overwritten_frames = 0
+            self._unread = False
+            self._last_frame_number = None
             self._is_streaming = True
+            if not self._read_every_frame:
+                self._capture_thread = threading.Thread(target=self._capture_loop, name="realsense-capture", daemon=True)
+                self._capture_thread.start()
             logger.info("Camera streaming started")
             return True
     
@@ -99,52 +172,183 @@ class RealSenseCamera:
                 return
             
             self._is_streaming = False
+            with self._frame_condition:
+                self._frame_condition.notify_all()
+            if self._capture_thread is not None and self._capture_thread is not threading.current_thread():
+                self._capture_thread.join(timeout=2.0)
+            self._capture_thread = None
             self._cleanup_pipeline()
             self._latest_frame = None
+            self._latest_depth = None
             self._frame_timestamp = None
+            self._frame_metadata = None
             
             logger.info("Camera streaming stopped")
     
+    def _capture_loop(self) -> None:
+        while self._is_streaming:
+            try:
+                frame = self._queue.wait_for_frame(100)
+            except RuntimeError:
+                # wait_for_frame raises on timeout; loop so stop() is noticed promptly
+                continue
+            except Exception as e:
+                logger.error(f"Error reading frame queue: {e}")
+                continue
+            
+            try:
+                self._handle_frameset(frame.as_frameset())
+            except Exception as e:
+                logger.error(f"Error processing frame: {e}")
+    
+    def _handle_frameset(self, frames) -> bool:
+        if self._align is not None:
+            frames = self._align.process(frames)
+        
+        color_frame = frames.get_color_frame()
+        if not color_frame:
+            logger.warning("Failed to get color frame")
+            return False
+        
+        color_image = np.asanyarray(color_frame.get_data())
+        
+        # Recordings may store rgb8; normalize to the bgr8 the live stream delivers
+        if color_frame.get_profile().format() == rs.format.rgb8:
+            if not self._convert_bgr_to_rgb:
+                color_image = cv2.cvtColor(color_image, cv2.COLOR_RGB2BGR)
+        elif self._convert_bgr_to_rgb:
+            color_image = cv2.cvtColor(color_image, cv2.COLOR_BGR2RGB)
+        if self._flip_horizontal:
+            color_image = cv2.flip(color_image, 1)
+        
+        depth_image = None
+        if self._enable_depth:
+            depth_frame = frames.get_depth_frame()
+            if depth_frame:
+                # View onto the SDK buffer; the array keeps the frame alive until it is released
+                depth_image = np.asanyarray(depth_frame.get_data())
+                if self._flip_horizontal:
+                    # Mirror to stay aligned with the flipped color image; a reversed slice is still a view
+                    depth_image = depth_image[:, ::-1]
+                depth_image.flags.writeable = False
+        
+        frame_number = color_frame.get_frame_number()
+        device_timestamp = color_frame.get_timestamp()
+        
+        with self._frame_condition:
+            if self._last_frame_number is not None and frame_number > self._last_frame_number + 1:
+                self._dropped_frames += frame_number - self._last_frame_number - 1
+            self._last_frame_number = frame_number
+            self._frame_count += 1
+            if self._unread:
+                # the previous frame was replaced before any getter read it
+                self._overwritten_frames += 1
+            self._unread = True
+            
+            self._latest_frame = color_image
+            self._latest_depth = depth_image
+            self._frame_timestamp = device_timestamp / 1000.0
+            self._frame_metadata = {
+                'frame_number': frame_number,
+                'device_timestamp_ms': device_timestamp,
+                'timestamp_domain': str(color_frame.get_frame_timestamp_domain()),
+                'host_timestamp': time.time(),
+            }
+            self._frame_condition.notify_all()
+        return True
+    
     def get_frame(self, timeout_ms: int = 5000) -> Optional[np.ndarray]:
         """
-        Returns color frame as numpy array, or None if failed
+        Waits for the next captured color frame and returns a copy, or None on timeout
+        (or at the end of a non-repeating recording in read_every_frame mode)
         """
         if not self._is_streaming:
             logger.warning("Camera is not streaming")
             return None
         
-        try:
-            frames = self._pipeline.wait_for_frames(timeout_ms)
-            color_frame = frames.get_color_frame()
-            
-            if not color_frame:
-                logger.warning("Failed to get color frame")
+        if self._read_every_frame:
+            try:
+                frames = self._pipeline.wait_for_frames(timeout_ms)
+            except RuntimeError:
+                logger.info("No more frames from playback")
                 return None
-            
-            color_image = np.asanyarray(color_frame.get_data())
-            
-            # Apply MediaPipe-specific transformations
-            if self._convert_bgr_to_rgb:
-                color_image = cv2.cvtColor(color_image, cv2.COLOR_BGR2RGB)
-            if self._flip_horizontal:
-                color_image = cv2.flip(color_image, 1)
-            
-            self._latest_frame = color_image
-            self._frame_timestamp = time.time()
-            
-            return color_image.copy()
-            
-        except Exception as e:
-            logger.error(f"Error getting frame: {e}")
-            return None
+            if not self._handle_frameset(frames):
+                return None
+            with self._frame_condition:
+                self._unread = False
+                return self._latest_frame.copy()
+        
+        with self._frame_condition:
+            last_count = self._frame_count
+            if not self._frame_condition.wait_for(lambda: self._frame_count != last_count or not self._is_streaming, timeout_ms / 1000.0):
+                logger.warning("Timed out waiting for color frame")
+                return None
+            if self._latest_frame is None:
+                return None
+            self._unread = False
+            return self._latest_frame.copy()
     
     def get_latest_frame(self) -> Optional[np.ndarray]:
         """Get the most recently cached frame without waiting."""
-        return self._latest_frame.copy() if self._latest_frame is not None else None
+        with self._frame_condition:
+            if self._latest_frame is None:
+                return None
+            self._unread = False
+            return self._latest_frame.copy()
+    
+    def get_latest_frameset(self) -> Optional[Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]]:
+        """
+        Get (color, depth, metadata) from the same frameset without waiting. Color is a copy;
+        depth is the read-only zero-copy view described in get_latest_depth, or None.
+        """
+        with self._frame_condition:
+            if self._latest_frame is None:
+                return None
+            self._unread = False
+            return self._latest_frame.copy(), self._latest_depth, dict(self._frame_metadata)
+    
+    def get_latest_depth(self) -> Optional[np.ndarray]:
+        """
+        Get the most recent depth image aligned to the color frame, as a read-only
+        zero-copy view of the SDK buffer (z16 units, see get_depth_scale). When
+        flip_horizontal is set the view is mirrored like the color image, so it is
+        not C-contiguous; copy it before handing it to APIs that require that.
+        Use get_latest_frameset when depth must match a specific color frame.
+        """
+        with self._frame_condition:
+            return self._latest_depth
+    
+    def get_depth_scale(self) -> Optional[float]:
+        if not self._is_streaming or not self._enable_depth:
+            return None
+        
+        try:
+            sensor = self._pipeline.get_active_profile().get_device().first_depth_sensor()
+            return sensor.get_depth_scale()
+        except Exception as e:
+            logger.error(f"Error getting depth scale: {e}")
+            return None
     
     def get_frame_timestamp(self) -> Optional[float]:
+        """Device timestamp of the latest frame, in seconds."""
         return self._frame_timestamp
     
+    def get_frame_metadata(self) -> Optional[Dict[str, Any]]:
+        with self._frame_condition:
+            return dict(self._frame_metadata) if self._frame_metadata is not None else None
+    
+    def get_stats(self) -> Dict[str, int]:
+        with self._frame_condition:
+            # sdk_dropped_frames: gaps in device frame numbers (never reached the capture thread)
+            # overwritten_frames: captured, but replaced before any getter read them
+            return {
+                'frames_captured': self._frame_count,
+                'dropped_frames': self._dropped_frames + self._overwritten_frames,
+                'sdk_dropped_frames': self._dropped_frames,
+                'overwritten_frames': self._overwritten_frames,
+                'queue_depth': self._queue_depth,
+            }
+    
     def get_intrinsics(self) -> Optional[Dict[str, Any]]:
         """Get camera intrinsic parameters."""
         if not self._is_streaming:
@@ -192,4 +396,16 @@ def create_mediapipe_camera(device_id: Optional[str] = None, resolution: Tuple[i
     camera.configure_stream(resolution, fps)
     camera.set_mediapipe_options(flip_horizontal=False, convert_bgr_to_rgb=True)
     
+    return camera
+
+
+def create_playback_camera(bag_file: str, repeat: bool = True, real_time: bool = True, enable_depth: bool = False, read_every_frame: bool = False) -> RealSenseCamera:
+    """
+    Create a camera that replays a recorded .bag file, for testing and benchmarking without hardware.
+    """
+    camera = RealSenseCamera(bag_file=bag_file)
+    camera.configure_stream(enable_depth=enable_depth)
+    camera.set_playback_options(repeat=repeat, real_time=real_time, read_every_frame=read_every_frame)
+    camera.set_mediapipe_options(flip_horizontal=False, convert_bgr_to_rgb=True)
+    
     return camera
\ No newline at end of file
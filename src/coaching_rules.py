@@ -0,0 +1,148 @@
+import json
+import os
+import re
+import statistics
+import threading
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+RULES_PATH = os.path.join(script_dir, "coaching_rules.json")
+# A rule needs at least one joint word and one check word ("knees" + "bend"), a total of
+# MIN_INTENT_SCORE hits, and MIN_INTENT_MARGIN more hits than the runner-up rule.
+MIN_INTENT_SCORE = 2
+MIN_INTENT_MARGIN = 2
+# Technique and strategy questions need the LLM even when they mention a joint
+TECHNIQUE_PATTERN = re.compile(r"\b(how (do|can|should|would) (i|we|you)|how to|what (should|do) (i|we)|should (i|we)|when (do|should) (i|we)|why)\b")
+
+NUMBER_WORDS = {"one": "1", "two": "2", "first": "1", "second": "2"}
+TARGET_PATTERN = re.compile(r"\bwrestler\s+(\d+|one|two)\b|\b(first|second)\s+wrestler\b")
+
+def tokenize(text):
+    return set(re.findall(r"[a-z]+", text.lower()))
+
+def find_target_label(question):
+    match = TARGET_PATTERN.search(question.lower())
+    if match is None:
+        return None
+    number = match.group(1) or match.group(2)
+    return f"Wrestler {NUMBER_WORDS.get(number, number)}"
+
+def count_hits(words, tokens, text):
+    return sum((word in text) if " " in word else (word in tokens) for word in words)
+
+def evaluate_condition(condition, wrestler):
+    """Returns True/False, or None when the wrestler's data for this condition is missing."""
+    if "angle" in condition:
+        angle = wrestler["angles"].get(condition["angle"])
+        if angle is None:
+            return None
+        if "above" in condition and angle <= condition["above"]:
+            return False
+        if "below" in condition and angle >= condition["below"]:
+            return False
+        return True
+
+    position = wrestler["positions"].get(condition["joint"])
+    if "lower_than" in condition:
+        reference = wrestler["positions"].get(condition["lower_than"])
+        # image y grows downward
+        return None if position is None or reference is None else position[1] > reference[1]
+    if "higher_than" in condition:
+        reference = wrestler["positions"].get(condition["higher_than"])
+        return None if position is None or reference is None else position[1] < reference[1]
+    return None
+
+def join_labels(labels):
+    if len(labels) <= 1:
+        return "".join(labels)
+    return ", ".join(labels[:-1]) + " and " + labels[-1]
+
+class RuleEngine:
+    """
+    Answers common questions from the rules in coaching_rules.json using the angles and
+    positions already in the pose caches, so simple threshold checks skip the LLM round trip.
+    """
+
+    def __init__(self, rules_path=RULES_PATH):
+        with open(rules_path, "r") as f:
+            self.rules = json.load(f)["rules"]
+
+    def match_rule(self, question):
+        text = question.lower()
+        if TECHNIQUE_PATTERN.search(text):
+            return None
+        tokens = tokenize(text)
+
+        scored = []
+        for rule in self.rules:
+            joint_hits = count_hits(rule["joints"], tokens, text)
+            check_hits = count_hits(rule["checks"], tokens, text)
+            scored.append((joint_hits + check_hits if joint_hits and check_hits else 0, rule))
+        scored.sort(key=lambda item: item[0], reverse=True)
+
+        best_score, best_rule = scored[0] if scored else (0, None)
+        runner_up = scored[1][0] if len(scored) > 1 else 0
+        if best_score < MIN_INTENT_SCORE or best_score - runner_up < MIN_INTENT_MARGIN:
+            return None
+        return best_rule
+
+    def answer(self, question, wrestlers):
+        """Returns a coach phrase, or None when no rule matches confidently and the LLM should answer."""
+        rule = self.match_rule(question)
+        if rule is None or not wrestlers:
+            return None
+
+        target_label = find_target_label(question)
+        if target_label is not None:
+            wrestlers = [wrestler for wrestler in wrestlers if wrestler["label"] == target_label]
+            if not wrestlers:
+                return None
+
+        flagged = []
+        for wrestler in wrestlers:
+            results = [evaluate_condition(condition, wrestler) for condition in rule["conditions"]]
+            # Only answer locally when every condition could be checked for every targeted wrestler
+            if None in results:
+                return None
+            fired = all(results) if rule.get("match") == "all" else any(results)
+            if fired:
+                flagged.append(wrestler["label"])
+
+        if flagged:
+            return rule["phrase"].format(labels=join_labels(flagged))
+        return rule.get("ok_phrase")
+
+    def phrases(self, labels):
+        """Every reply answer() can give when the wrestlers on the mat carry these labels."""
+        combinations = [[label] for label in labels] + ([list(labels)] if len(labels) > 1 else [])
+        replies = []
+        for rule in self.rules:
+            replies.extend(rule["phrase"].format(labels=join_labels(flagged)) for flagged in combinations)
+            if rule.get("ok_phrase"):
+                replies.append(rule["ok_phrase"])
+        return replies
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, round(pct / 100 * (len(ordered) - 1)))]
+
+class PathStats:
+    """Hit rate and latency per answer path (local rules vs LLM), from question to end of speech."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._latencies = {}
+
+    def record(self, path, seconds):
+        with self._lock:
+            self._latencies.setdefault(path, []).append(seconds * 1000)
+
+    def summary(self):
+        with self._lock:
+            total = sum(len(latencies) for latencies in self._latencies.values())
+            parts = []
+            for path, latencies in sorted(self._latencies.items()):
+                parts.append(
+                    f"{path}: {len(latencies)}/{total} ({100 * len(latencies) / total:.0f}%), "
+                    f"mean {statistics.fmean(latencies):.1f} ms, p95 {percentile(latencies, 95):.1f} ms"
+                )
+            return " | ".join(parts)
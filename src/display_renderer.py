@@ -0,0 +1,207 @@
+import cv2
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import media_pipe_handler
+
+WINDOW_NAME = "Wrestling Coach"
+DEFAULT_DISPLAY_FPS = 15
+JPEG_QUALITY = 70
+BOX_COLOR = (0, 220, 120)
+
+class MjpegStream:
+    """Serves the latest rendered frame as multipart/x-mixed-replace for headless viewing."""
+
+    def __init__(self, port, host="0.0.0.0"):
+        self._condition = threading.Condition()
+        self._jpeg = None
+        self._sequence = 0
+        self._clients = 0
+        self._running = False
+        self._server = ThreadingHTTPServer((host, port), self._make_handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def has_clients(self):
+        return self._clients > 0
+
+    def _make_handler(self):
+        stream = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/", "/stream.mjpg"):
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Cache-Control", "no-cache")
+                self.send_header("Content-Type", "multipart/x-mixed-replace; boundary=frame")
+                self.end_headers()
+                stream._serve(self.wfile)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def _serve(self, wfile):
+        with self._condition:
+            self._clients += 1
+        # frames are only encoded once a client is connected, so wait for the first real one
+        last_sequence = 0
+        try:
+            while self._running:
+                with self._condition:
+                    self._condition.wait_for(
+                        lambda: (self._jpeg is not None and self._sequence != last_sequence) or not self._running,
+                        timeout=1.0,
+                    )
+                    if self._jpeg is None or self._sequence == last_sequence:
+                        continue
+                    jpeg = self._jpeg
+                    last_sequence = self._sequence
+                wfile.write(b"--frame\r\nContent-Type: image/jpeg\r\n")
+                wfile.write(f"Content-Length: {len(jpeg)}\r\n\r\n".encode())
+                wfile.write(jpeg)
+                wfile.write(b"\r\n")
+        except OSError:
+            # client went away (broken pipe, reset, timeout); only this handler thread ends
+            pass
+        finally:
+            with self._condition:
+                self._clients -= 1
+
+    def publish(self, frame):
+        ok, encoded = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, JPEG_QUALITY])
+        if not ok:
+            return
+        with self._condition:
+            self._jpeg = encoded.tobytes()
+            self._sequence += 1
+            self._condition.notify_all()
+
+    def start(self):
+        self._running = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        host, port = self._server.server_address[:2]
+        print(f"MJPEG stream at http://{host}:{port}/stream.mjpg")
+
+    def stop(self):
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        self._server.shutdown()
+        self._server.server_close()
+
+class DisplayRenderer:
+    """
+    Renders the latest submitted frame on its own thread at a capped rate,
+    so drawing, imshow/waitKey and JPEG encoding never block inference.
+    """
+
+    def __init__(self, max_fps=DEFAULT_DISPLAY_FPS, show_window=True, mjpeg_port=None, on_quit=None):
+        self._frame_interval = 1.0 / max_fps if max_fps else 0.0
+        self._show_window = show_window
+        self._on_quit = on_quit
+        self._stream = MjpegStream(mjpeg_port) if mjpeg_port else None
+        self._lock = threading.Lock()
+        self._new_frame = threading.Event()
+        self._latest = None
+        self._running = False
+        self._thread = None
+        self._fullscreen = False
+
+    def start(self):
+        self._running = True
+        if self._stream is not None:
+            self._stream.start()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._running = False
+        self._new_frame.set()
+        if self._stream is not None:
+            self._stream.stop()
+
+    def submit(self, frame, people):
+        # Landmarks are captured now so the frame is drawn with its own skeleton, not a later one.
+        # Only reference swaps; frames the renderer falls behind on are simply dropped.
+        landmarks = media_pipe_handler.get_landmark_snapshots(people)
+        with self._lock:
+            self._latest = (frame, people, landmarks)
+        self._new_frame.set()
+
+    def toggle_fullscreen(self):
+        self._fullscreen = not self._fullscreen
+        if self._fullscreen:
+            cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+        else:
+            cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+            cv2.resizeWindow(WINDOW_NAME, 960, 720)
+
+    def _setup_window(self):
+        cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
+        cv2.resizeWindow(WINDOW_NAME, 960, 720)
+
+    def _run(self):
+        # HighGUI windows must be created and pumped from the same thread.
+        if self._show_window:
+            self._setup_window()
+        next_render = 0.0
+        while self._running:
+            if not self._new_frame.wait(timeout=0.05):
+                self._poll_keys()
+                continue
+
+            delay = next_render - time.monotonic()
+            if delay > 0:
+                self._poll_keys(delay)
+                continue
+
+            with self._lock:
+                latest = self._latest
+                self._latest = None
+                self._new_frame.clear()
+            if latest is None:
+                continue
+
+            streaming = self._stream is not None and self._stream.has_clients
+            if not self._show_window and not streaming:
+                # headless with nobody watching: skip the conversion and overlays entirely
+                continue
+
+            next_render = time.monotonic() + self._frame_interval
+            display_frame = self._render(*latest)
+            if streaming:
+                self._stream.publish(display_frame)
+            if self._show_window:
+                cv2.imshow(WINDOW_NAME, display_frame)
+                self._poll_keys()
+
+    def _poll_keys(self, delay=0.0):
+        if not self._show_window:
+            if delay > 0:
+                time.sleep(delay)
+            return
+        key = cv2.waitKey(max(1, int(delay * 1000))) & 0xFF
+        if key == ord('q') and self._on_quit is not None:
+            self._on_quit()
+        elif key == ord('f'):
+            self.toggle_fullscreen()
+
+    def _render(self, frame, people, landmarks):
+        display_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
+        media_pipe_handler.draw_pose_landmarks(display_frame, landmarks)
+        draw_detections(display_frame, people)
+        return display_frame
+
+def draw_detections(display_frame, people):
+    for person in people:
+        x1, y1, x2, y2 = person["box"]
+        label = f'{person["label"]} {person["confidence"]:.2f}'
+        cv2.rectangle(display_frame, (x1, y1), (x2, y2), BOX_COLOR, 2)
+        cv2.putText(display_frame, label, (x1, max(20, y1 - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.55, BOX_COLOR, 2)
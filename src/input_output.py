@@ -1,21 +1,45 @@
 import asyncio
+import io
+import threading
+import time
 from ai_handler import AiHandler
 from media_pipe_handler import MediaPipeHandler
-import speech_recognition as sr
-import edge_tts as tts
-import pyaudio
-import io
-from pydub import AudioSegment
+from coaching_rules import RuleEngine, PathStats
+import startup
 
-AudioSegment.converter = "ffmpeg"    # or full path 
-AudioSegment.ffprobe = "ffprobe"
+# Audio libraries are imported by load_audio() on first use so importing this module stays cheap
+sr = None
+tts = None
+pyaudio = None
+AudioSegment = None
+recognizer = None
+audio_lock = threading.Lock()
 
-recognizer = sr.Recognizer()
 listen_and_speak = True
 VOICE = "en-US-AndrewNeural"
 NAME = "assistant"
+# Fixed replies synthesized during warm-up so they play without a TTS round trip
+CACHED_PHRASES = ("How may I help you?", "I cannot see you right now.")
+# Rule replies are pre-synthesized for these labels; replies for other track ids are cached when first spoken
+CACHED_LABELS = ("Wrestler 1", "Wrestler 2")
+phrase_cache = {}
 api = AiHandler()
 mp_handler = MediaPipeHandler()
+rule_engine = RuleEngine()
+path_stats = PathStats()
+
+def load_audio():
+    global sr, tts, pyaudio, AudioSegment, recognizer
+    with audio_lock:
+        if recognizer is None:
+            import speech_recognition as sr
+            import edge_tts as tts
+            import pyaudio
+            from pydub import AudioSegment
+
+            AudioSegment.converter = "ffmpeg"    # or full path 
+            AudioSegment.ffprobe = "ffprobe"
+            recognizer = sr.Recognizer()
 
 async def listen():
     while listen_and_speak:
@@ -46,14 +70,12 @@ async def listen_for_instructions():
             try:
                 audio = recognizer.listen(source, timeout=10, phrase_time_limit=10)
                 text = recognizer.recognize_google(audio)
-                prompt = mp_handler.create_request()
-                if not prompt:
+                wrestlers = mp_handler.get_wrestlers()
+                if not wrestlers:
                     await speak("I cannot see you right now.")
                     attempts+=1
                     continue
-                request = f"Spoken question: {text}{prompt}"
-                response = await api.query(request)
-                await speak(response)
+                await answer_question(text, wrestlers)
                 return
             except sr.UnknownValueError:
                 recognizer.adjust_for_ambient_noise(source)
@@ -68,15 +90,35 @@ async def listen_for_instructions():
         if attempts >= 3: await speak("I couldn't process your request. Give me a moment, and try again.")
 
 
+async def answer_question(text, wrestlers):
+    # Local rules answer simple threshold questions in milliseconds; anything else goes to the LLM.
+    # Latency runs until the reply has been spoken, so TTS is part of each path's number.
+    start = time.perf_counter()
+    response = rule_engine.answer(text, wrestlers)
+    if response is not None:
+        path = "rules"
+        # rule replies come from a small fixed set, so keeping them is bounded
+        await speak(response, cache=True)
+    else:
+        path = "llm"
+        request = f"Spoken question: {text}{mp_handler.create_request(wrestlers)}"
+        response = await api.query(request)
+        await speak(response)
+    path_stats.record(path, time.perf_counter() - start)
+    print("Answer paths (question to end of speech) -", path_stats.summary())
+    return response
+
 #edge_tts produces mp3, pyaudio needs pcm, so there's a conversion
-async def speak(text):
+async def synthesize(text):
     communicate = tts.Communicate(text, VOICE)
 
     mp3 = b""
     async for chunk in communicate.stream():
         if chunk["type"] == "audio":
             mp3 += chunk["data"]
-    audio_segment = AudioSegment.from_file(io.BytesIO(mp3), format="mp3")
+    return AudioSegment.from_file(io.BytesIO(mp3), format="mp3")
+
+def play(audio_segment):
     pcm = audio_segment.raw_data
     sample_width = audio_segment.sample_width
     sample_rate = audio_segment.frame_rate
@@ -89,5 +131,26 @@ async def speak(text):
     stream.close()
     audio.terminate()
 
+async def speak(text, cache=False):
+    load_audio()
+    audio_segment = phrase_cache.get(text)
+    if audio_segment is None:
+        audio_segment = await synthesize(text)
+        if cache:
+            phrase_cache[text] = audio_segment
+    play(audio_segment)
+
+def warm_up():
+    load_audio()
+
+    async def prepare_phrases():
+        for phrase in (*CACHED_PHRASES, *rule_engine.phrases(CACHED_LABELS)):
+            if phrase not in phrase_cache:
+                phrase_cache[phrase] = await synthesize(phrase)
+
+    asyncio.run(prepare_phrases())
+
 def main():
+    load_audio()
+    startup.mark("listening for wake word")
     asyncio.run(listen())
@@ -0,0 +1,216 @@
+import math
+import time
+import numpy as np
+
+# Every statistic is an exponentially weighted average updated in O(1) per pose result,
+# so the snapshot never has to rescan frame history. State for track ids not seen for
+# STALE_SECONDS is dropped, so per-frame work is bounded by the wrestlers in view.
+FAST_TAU_SECONDS = 0.15
+SLOW_TAU_SECONDS = 1.5
+# Standing height and the level baseline rise at SLOW_TAU but sink much slower, so a level
+# change is measured against the stance before it instead of being normalized away.
+STANDING_DECAY_TAU_SECONDS = 10.0
+BASELINE_DECAY_TAU_SECONDS = 4.0
+MAX_GAP_SECONDS = 0.5
+STALE_SECONDS = 2
+VISIBILITY_THRESHOLD = 0.5
+LEVEL_CHANGE_DROP = 0.12
+LEVEL_CHANGE_RESET = 0.05
+FACING_MIN_OFFSET = 0.15
+TOP_JOINTS = 3
+TORSO_JOINTS = ("LEFT_SHOULDER", "RIGHT_SHOULDER", "LEFT_HIP", "RIGHT_HIP")
+
+def ewma_alpha(dt, tau):
+    return 1.0 - math.exp(-dt / tau)
+
+class WrestlerKinematics:
+    def __init__(self, joint_count):
+        self.timestamp = None
+        self.points = np.zeros((joint_count, 2))
+        self.visible = np.zeros(joint_count, dtype=bool)
+        self.velocity = np.zeros((joint_count, 2))
+        self.body_height = None
+        self.com = None
+        self.com_raw_height = None
+        self.com_height = None
+        self.com_baseline = None
+        self.com_vertical_speed = 0.0
+        self.level_changes = 0
+        self.in_low_level = False
+        self.facing = 0
+
+class KinematicsTracker:
+    """
+    Per-wrestler motion features (joint velocities, center-of-mass height, trend and level
+    changes) plus distance and facing between wrestlers, all in frame coordinates.
+    Lengths are in body heights (the wrestler's standing box height) so values do not depend
+    on camera distance. Call update() for each pose result and end_frame() once every
+    wrestler in the frame has been updated.
+    """
+
+    def __init__(self, landmark_index, max_wrestlers=2):
+        self.joint_names = list(landmark_index)
+        self.joint_index = np.array(list(landmark_index.values()), dtype=np.intp)
+        self.torso = np.array([self.joint_names.index(name) for name in TORSO_JOINTS], dtype=np.intp)
+        self.nose = self.joint_names.index("NOSE")
+        self.shoulders = self.torso[:2]
+        self.max_wrestlers = max_wrestlers
+        self.wrestlers = {}
+        self.relations = {}
+        self.updated = set()
+
+    def update(self, wrestler_id, landmarks, box, now=None):
+        """landmarks: (33, 4) crop-normalized x, y, z, visibility; box: frame pixel (x1, y1, x2, y2)."""
+        now = time.monotonic() if now is None else now
+        x1, y1, x2, y2 = box
+        box_height = max(y2 - y1, 1)
+        subset = landmarks[self.joint_index]
+        points = np.empty((len(subset), 2))
+        points[:, 0] = x1 + subset[:, 0] * (x2 - x1)
+        points[:, 1] = y1 + subset[:, 1] * box_height
+        visible = subset[:, 3] > VISIBILITY_THRESHOLD
+
+        state = self.wrestlers.get(wrestler_id)
+        if state is None:
+            state = self.wrestlers[wrestler_id] = WrestlerKinematics(len(points))
+        dt = now - state.timestamp if state.timestamp is not None else None
+        continuous = dt is not None and 0 < dt <= MAX_GAP_SECONDS
+
+        if continuous:
+            if box_height > state.body_height:
+                state.body_height += ewma_alpha(dt, SLOW_TAU_SECONDS) * (box_height - state.body_height)
+            elif not state.in_low_level and not (state.com_height is not None and state.com_height < state.com_baseline):
+                # frozen while dropping level, otherwise the shrinking box cancels the drop
+                state.body_height += ewma_alpha(dt, STANDING_DECAY_TAU_SECONDS) * (box_height - state.body_height)
+            alpha = ewma_alpha(dt, FAST_TAU_SECONDS)
+            tracked = visible & state.visible
+            instant = (points[tracked] - state.points[tracked]) / (dt * state.body_height)
+            state.velocity[tracked] += alpha * (instant - state.velocity[tracked])
+            state.velocity[~tracked] = 0.0
+        else:
+            state.body_height = float(box_height)
+            state.velocity[:] = 0.0
+        state.points = points
+        state.visible = visible
+
+        self._update_center_of_mass(state, points, visible, y2, dt if continuous else None)
+        self._update_facing(state, points, visible)
+        state.timestamp = now
+        self.updated.add(wrestler_id)
+
+    def _update_center_of_mass(self, state, points, visible, floor_y, dt):
+        torso_visible = visible[self.torso]
+        if not torso_visible.any():
+            return
+        state.com = points[self.torso][torso_visible].mean(axis=0)
+        height = (floor_y - state.com[1]) / state.body_height
+
+        if dt is None or state.com_height is None:
+            state.com_raw_height = state.com_height = state.com_baseline = height
+            state.com_vertical_speed = 0.0
+            return
+
+        alpha = ewma_alpha(dt, FAST_TAU_SECONDS)
+        state.com_vertical_speed += alpha * ((height - state.com_raw_height) / dt - state.com_vertical_speed)
+        state.com_height += alpha * (height - state.com_height)
+        baseline_tau = SLOW_TAU_SECONDS if height > state.com_baseline else BASELINE_DECAY_TAU_SECONDS
+        state.com_baseline += ewma_alpha(dt, baseline_tau) * (height - state.com_baseline)
+        state.com_raw_height = height
+
+        # hysteresis so one shot counts once
+        drop = state.com_baseline - state.com_height
+        if not state.in_low_level and drop > LEVEL_CHANGE_DROP:
+            state.in_low_level = True
+            state.level_changes += 1
+        elif state.in_low_level and drop < LEVEL_CHANGE_RESET:
+            state.in_low_level = False
+
+    def _update_facing(self, state, points, visible):
+        if not visible[self.nose] or not visible[self.shoulders].all():
+            state.facing = 0
+            return
+        left, right = points[self.shoulders, 0]
+        offset = (points[self.nose, 0] - (left + right) / 2) / max(abs(left - right), 1.0)
+        state.facing = int(np.sign(offset)) if abs(offset) > FACING_MIN_OFFSET else 0
+
+    def end_frame(self, now=None):
+        """Drops stale track ids, then updates relations once per frame from every wrestler's current state."""
+        now = time.monotonic() if now is None else now
+        for wrestler_id in [wrestler_id for wrestler_id, state in self.wrestlers.items() if now - state.timestamp > STALE_SECONDS]:
+            del self.wrestlers[wrestler_id]
+        for key in [
+            key for key, relation in self.relations.items()
+            if key[0] not in self.wrestlers or key[1] not in self.wrestlers or now - relation["timestamp"] > STALE_SECONDS
+        ]:
+            del self.relations[key]
+
+        if self.updated:
+            # only the wrestlers currently on the mat are paired, however many ids are still cached
+            recent = [
+                (state.timestamp, wrestler_id) for wrestler_id, state in self.wrestlers.items()
+                if state.com is not None and now - state.timestamp <= MAX_GAP_SECONDS
+            ]
+            active = sorted(wrestler_id for _, wrestler_id in sorted(recent, reverse=True)[:self.max_wrestlers])
+            for index, id_a in enumerate(active):
+                for id_b in active[index + 1:]:
+                    if id_a in self.updated or id_b in self.updated:
+                        self._update_relation(id_a, id_b, now)
+        self.updated.clear()
+
+    def _update_relation(self, id_a, id_b, now):
+        state, other = self.wrestlers[id_a], self.wrestlers[id_b]
+        scale = (state.body_height + other.body_height) / 2
+        distance = float(np.hypot(*(state.com - other.com))) / scale
+        relation = self.relations.get((id_a, id_b))
+        if relation is None:
+            relation = self.relations[(id_a, id_b)] = {"distance": distance, "closing_speed": 0.0, "raw_distance": distance, "timestamp": now}
+        else:
+            dt = now - relation["timestamp"]
+            if dt <= 0:
+                return
+            if dt > MAX_GAP_SECONDS:
+                relation.update(distance=distance, closing_speed=0.0)
+            else:
+                alpha = ewma_alpha(dt, FAST_TAU_SECONDS)
+                closing = (relation["raw_distance"] - distance) / dt
+                relation["closing_speed"] += alpha * (closing - relation["closing_speed"])
+                relation["distance"] += alpha * (distance - relation["distance"])
+            relation["raw_distance"] = distance
+            relation["timestamp"] = now
+
+        # +1 when the wrestler's head points toward the other in the image, -1 away, 0 unknown
+        toward = np.sign(other.com[0] - state.com[0])
+        relation["facing"] = {
+            id_a: int(state.facing * toward),
+            id_b: int(other.facing * -toward),
+        }
+
+    def snapshot(self, now=None):
+        now = time.monotonic() if now is None else now
+        wrestlers = {}
+        for wrestler_id, state in self.wrestlers.items():
+            if state.timestamp is None or now - state.timestamp > STALE_SECONDS:
+                continue
+            speeds = np.hypot(state.velocity[:, 0], state.velocity[:, 1])
+            speeds[~state.visible] = np.nan
+            visible_order = [int(i) for i in np.argsort(-np.nan_to_num(speeds, nan=-1.0)) if state.visible[i]]
+            wrestlers[wrestler_id] = {
+                "joint_speeds": {self.joint_names[i]: round(float(speeds[i]), 2) for i in visible_order},
+                "fastest_joints": [self.joint_names[i] for i in visible_order[:TOP_JOINTS]],
+                "com_height": None if state.com_height is None else round(float(state.com_height), 2),
+                "com_trend": round(float(state.com_vertical_speed), 2),
+                "level_changes": state.level_changes,
+                "in_low_level": state.in_low_level,
+            }
+
+        relations = []
+        for (id_a, id_b), relation in self.relations.items():
+            if id_a not in wrestlers or id_b not in wrestlers or now - relation["timestamp"] > STALE_SECONDS:
+                continue
+            relations.append({
+                "wrestlers": (id_a, id_b),
+                "distance": round(relation["distance"], 2),
+                "closing_speed": round(relation["closing_speed"], 2),
+                "facing": dict(relation.get("facing", {})),
+            })
+        return {"wrestlers": wrestlers, "relations": relations}
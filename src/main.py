@@ -1,3 +1,4 @@
+import startup
 import input_output
 import media_pipe_handler
 import ai_handler
@@ -5,9 +6,18 @@ import wrestler_tracker
 import time
 from threading import Thread
 
+startup.mark("modules imported")
+
 Thread(target=input_output.main, daemon=True).start()
 Thread(target=wrestler_tracker.camera_stream_thread, daemon=True).start()
 
+warm_ups = [
+    startup.warm_up_in_background("YOLO", wrestler_tracker.warm_up),
+    startup.warm_up_in_background("Pose", media_pipe_handler.warm_up),
+    startup.warm_up_in_background("TTS", input_output.warm_up),
+]
+Thread(target=startup.report, args=(warm_ups,), daemon=True).start()
+
 try:
     while True:
         time.sleep(0.5)
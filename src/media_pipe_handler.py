@@ -1,6 +1,5 @@
 import cv2
 import numpy as np
-import mediapipe as mp
 import json
 import os
 import math
@@ -8,31 +7,90 @@ import threading
 import sys
 from collections import deque
 from datetime import datetime
+from kinematics import KinematicsTracker
 
-mp_pose = mp.solutions.pose
-mp_draw = mp.solutions.drawing_utils
-PoseLandmark = mp.solutions.pose.PoseLandmark
+# mediapipe is imported on first use (see load_mediapipe) so importing this module stays cheap
+mp_pose = None
+PoseLandmark = None
 
-joint_angles = {}
 script_dir = os.path.dirname(os.path.abspath(__file__))
 file_path = os.path.join(script_dir, "joint_data.json")
 with open(file_path, "r") as f:
-    joint_angles = json.load(f)["joint_angles"]
-
-
-with open(file_path, "r") as f:
-    joint_positions = json.load(f)["joint_positions"]
+    joint_data = json.load(f)
+joint_angles = joint_data["joint_angles"]
+joint_positions = joint_data["joint_positions"]
 
 MAX_CACHE_LEN = 5
 VISIBILITY_THRESHOLD = 0.85
 MAX_FRAME_AGE_SECONDS = 2
 MAX_WRESTLERS = 2
+# "crop": one Pose graph per wrestler crop, "multi": one PoseLandmarker pass over the full frame
+# in video mode, "multi-live": the same in live-stream mode (results arrive asynchronously)
+POSE_ENGINES = ("crop", "multi", "multi-live")
+POSE_ENGINE = os.getenv("POSE_ENGINE", "crop")
+if POSE_ENGINE not in POSE_ENGINES:
+    raise ValueError(f"Unknown POSE_ENGINE {POSE_ENGINE!r}; expected one of {', '.join(POSE_ENGINES)}")
+DRAW_VISIBILITY_THRESHOLD = 0.5
+LANDMARK_COLOR = (0, 0, 255)
+CONNECTION_COLOR = (255, 255, 255)
+
+# (K, 2) landmark index pairs, built once so overlays can gather every bone in a single numpy pass
+POSE_CONNECTION_INDEX = None
 
 cache_lock = threading.Lock()
 running = True
 frame_results = {}
+frame_landmarks = {}
 poses = {}
+pose_pool = []
 wrestler_caches = {}
+mediapipe_lock = threading.Lock()
+kinematics = None
+multi_pose_engine = None
+engine_lock = threading.Lock()
+
+def load_mediapipe():
+    global mp_pose, PoseLandmark, POSE_CONNECTION_INDEX, kinematics
+    with mediapipe_lock:
+        if mp_pose is None:
+            import mediapipe as mp
+            PoseLandmark = mp.solutions.pose.PoseLandmark
+            POSE_CONNECTION_INDEX = np.array(sorted(mp.solutions.pose.POSE_CONNECTIONS), dtype=np.intp)
+            kinematics = KinematicsTracker({name: PoseLandmark[name].value for name in joint_positions}, MAX_WRESTLERS)
+            mp_pose = mp.solutions.pose
+    return mp_pose
+
+def get_multi_pose_engine():
+    """Returns the full-frame engine, or None when running per-crop (including after a failed start)."""
+    global multi_pose_engine, POSE_ENGINE
+    if multi_pose_engine is not None or POSE_ENGINE == "crop":
+        return multi_pose_engine
+    with engine_lock:
+        if multi_pose_engine is None and POSE_ENGINE != "crop":
+            try:
+                from multi_pose_engine import MultiPoseEngine
+                engine = MultiPoseEngine(live_stream=POSE_ENGINE == "multi-live")
+                engine.warm_up()
+            except Exception as e:
+                print(f"Multi-pose engine unavailable ({e}); falling back to per-crop Pose.")
+                POSE_ENGINE = "crop"
+                return None
+            multi_pose_engine = engine
+    return multi_pose_engine
+
+def warm_up():
+    if get_multi_pose_engine() is not None:
+        return
+    warm_up_pose_pool()
+
+def warm_up_pose_pool():
+    # Pre-build and run one Pose graph per wrestler slot; get_pose hands them out to new track ids.
+    load_mediapipe()
+    blank = np.zeros((256, 256, 3), dtype=np.uint8)
+    for _ in range(MAX_WRESTLERS - len(pose_pool)):
+        pose_instance = mp_pose.Pose()
+        pose_instance.process(blank)
+        pose_pool.append(pose_instance)
 
 def create_angle_cache():
     return [{"name": angle_name, "frames": deque([])} for angle_name in joint_angles]
@@ -54,7 +112,10 @@ def get_wrestler_cache(wrestler_id):
 
 def get_pose(wrestler_id):
     if wrestler_id not in poses:
-        poses[wrestler_id] = mp_pose.Pose()
+        if pose_pool:
+            poses[wrestler_id] = pose_pool.pop()
+        else:
+            poses[wrestler_id] = load_mediapipe().Pose()
     return poses[wrestler_id]
 
 def is_joint_angle_visible(joint, mp_result):
@@ -81,6 +142,9 @@ def get_joint_angle(a, b, c):
     angle_deg = np.degrees(angle_rad)
     return round(angle_deg, 3)
 
+def landmarks_to_array(landmark):
+    return np.array([(lm.x, lm.y, lm.z, lm.visibility) for lm in landmark], dtype=np.float32)
+
 def record_pose_result(wrestler_id, result, label=None, box=None, confidence=None):
     if result.pose_landmarks is None:
         return
@@ -94,6 +158,11 @@ def record_pose_result(wrestler_id, result, label=None, box=None, confidence=Non
     frame_results[wrestler_id] = result
 
     landmark = result.pose_landmarks.landmark
+    if box is not None:
+        landmarks = landmarks_to_array(landmark)
+        frame_landmarks[wrestler_id] = (landmarks, box)
+        kinematics.update(wrestler_id, landmarks, box)
+
     for joint in cache["angle_cache"]:
         if not is_joint_angle_visible(joint, result):
             continue
@@ -122,6 +191,11 @@ def record_pose_result(wrestler_id, result, label=None, box=None, confidence=Non
             "timestamp": now,
         })
 
+def finish_frame():
+    # Called under cache_lock once every wrestler in the frame is recorded, so relations use one frame's poses
+    if kinematics is not None:
+        kinematics.end_frame()
+
 def process_wrestler_frames(wrestler_frames):
     with cache_lock:
         for wrestler in wrestler_frames[:MAX_WRESTLERS]:
@@ -138,20 +212,46 @@ def process_wrestler_frames(wrestler_frames):
                 box=wrestler.get("box"),
                 confidence=wrestler.get("confidence"),
             )
+        finish_frame()
 
-def draw_pose_landmarks(display_frame, wrestler_frames):
-    with cache_lock:
-        for wrestler in wrestler_frames:
-            result = frame_results.get(wrestler["id"])
-            if result is None or result.pose_landmarks is None:
-                continue
+def process_frame(frame, wrestler_frames):
+    engine = get_multi_pose_engine()
+    if engine is not None:
+        engine.process(frame, wrestler_frames)
+    else:
+        process_wrestler_frames(wrestler_frames)
 
-            x1, y1, x2, y2 = wrestler["box"]
-            display_crop = display_frame[y1:y2, x1:x2]
-            if display_crop.size == 0:
-                continue
+def get_landmark_snapshots(wrestler_frames):
+    # record_pose_result stores a new array per result, so holding references is a stable snapshot
+    with cache_lock:
+        return [frame_landmarks.get(wrestler["id"]) for wrestler in wrestler_frames]
 
-            mp_draw.draw_landmarks(display_crop, result.pose_landmarks, mp_pose.POSE_CONNECTIONS)
+def draw_pose_landmarks(display_frame, snapshots):
+    segments = []
+    joints = []
+    for snapshot in snapshots:
+        if snapshot is None:
+            continue
+        landmarks, (x1, y1, x2, y2) = snapshot
+        # crop-normalized -> frame pixel coordinates for all landmarks at once
+        points = np.empty((len(landmarks), 2), dtype=np.int32)
+        points[:, 0] = x1 + landmarks[:, 0] * (x2 - x1)
+        points[:, 1] = y1 + landmarks[:, 1] * (y2 - y1)
+        visible = landmarks[:, 3] > DRAW_VISIBILITY_THRESHOLD
+
+        bone_mask = visible[POSE_CONNECTION_INDEX].all(axis=1)
+        segments.append(points[POSE_CONNECTION_INDEX[bone_mask]])
+        # zero-length segments render as round dots, so joints share the same batched call
+        joints.append(np.repeat(points[visible][:, None, :], 2, axis=1))
+
+    if not segments:
+        return
+    bones = np.concatenate(segments)
+    dots = np.concatenate(joints)
+    if len(bones):
+        cv2.polylines(display_frame, list(bones), False, CONNECTION_COLOR, 2)
+    if len(dots):
+        cv2.polylines(display_frame, list(dots), False, LANDMARK_COLOR, 5)
 
 def extract_angles(angle_cache):
     joints = {}
@@ -197,10 +297,13 @@ def extract_positions(position_cache):
 
     return joints
 
+FACING_WORDS = {1: "toward the other", -1: "away", 0: "unclear"}
+
 def construct_prompt(wrestlers):
     parts = []
     parts.append("\n\nCurrent mat vision data:\n")
     parts.append("Each wrestler entry is separate. Joint angles are degrees. Positions are normalized crop coordinates (x, y, z), so compare posture within each wrestler more than exact mat distance.\n")
+    parts.append("Motion and between-wrestler values use frame coordinates in body heights (bh); speeds are bh per second, and a negative center of mass trend means dropping level.\n")
 
     for wrestler in wrestlers:
         parts.append(f"\n{wrestler['label']}:\n")
@@ -215,6 +318,30 @@ def construct_prompt(wrestlers):
         for joint, position in wrestler["positions"].items():
             parts.append(f"- {joint}: {position}\n")
 
+        motion = wrestler.get("motion")
+        if motion:
+            parts.append("motion:\n")
+            if motion["com_height"] is not None:
+                level = "low" if motion["in_low_level"] else "normal"
+                parts.append(f"- center_of_mass_height: {motion['com_height']} bh (trend {motion['com_trend']} bh/s, level changes {motion['level_changes']}, currently {level})\n")
+            for joint in motion["fastest_joints"]:
+                parts.append(f"- {joint} speed: {motion['joint_speeds'][joint]} bh/s\n")
+
+    labels = {wrestler["id"]: wrestler["label"] for wrestler in wrestlers}
+    relations = {
+        relation["wrestlers"]: relation
+        for wrestler in wrestlers for relation in wrestler.get("relations", [])
+        if all(wrestler_id in labels for wrestler_id in relation["wrestlers"])
+    }
+    if relations:
+        parts.append("\nBetween wrestlers:\n")
+    for (id_a, id_b), relation in relations.items():
+        facing = ", ".join(
+            f"{labels[wrestler_id]} facing {FACING_WORDS[value]}"
+            for wrestler_id, value in relation["facing"].items()
+        )
+        parts.append(f"- {labels[id_a]} / {labels[id_b]}: distance {relation['distance']} bh, closing at {relation['closing_speed']} bh/s; {facing}\n")
+
     prompt = "".join(parts)
     return prompt
 
@@ -223,15 +350,18 @@ def end_program():
     running = False
     print("Stopping program...")
     cv2.destroyAllWindows()
-    for pose_instance in poses.values():
+    for pose_instance in list(poses.values()) + pose_pool:
         pose_instance.close()
+    if multi_pose_engine is not None:
+        multi_pose_engine.close()
     sys.exit()
 
 class MediaPipeHandler:
-    def create_request(self):
+    def get_wrestlers(self):
         with cache_lock:
             wrestlers = []
             now = datetime.now()
+            motion = kinematics.snapshot() if kinematics is not None else {"wrestlers": {}, "relations": []}
             for wrestler_id, cache in sorted(wrestler_caches.items()):
                 if cache["last_seen"] is None:
                     continue
@@ -249,8 +379,15 @@ class MediaPipeHandler:
                     "confidence": cache["confidence"],
                     "angles": angles,
                     "positions": positions,
+                    "motion": motion["wrestlers"].get(wrestler_id),
+                    "relations": [relation for relation in motion["relations"] if wrestler_id in relation["wrestlers"]],
                 })
 
-            if wrestlers:
-                return construct_prompt(wrestlers)
-            return False
+            return wrestlers
+
+    def create_request(self, wrestlers=None):
+        if wrestlers is None:
+            wrestlers = self.get_wrestlers()
+        if wrestlers:
+            return construct_prompt(wrestlers)
+        return False
@@ -0,0 +1,156 @@
+import os
+import time
+import threading
+import numpy as np
+from types import SimpleNamespace
+import media_pipe_handler
+
+# Download from https://developers.google.com/mediapipe/solutions/vision/pose_landmarker (lite/full/heavy)
+MODEL_PATH = os.path.join(media_pipe_handler.script_dir, "pose_landmarker_full.task")
+MATCH_VISIBILITY_THRESHOLD = 0.5
+MIN_BOX_OVERLAP = 0.5
+MAX_PENDING_FRAMES = 8
+
+def match_poses_to_boxes(pose_arrays, boxes, width, height):
+    """
+    Pairs each detected pose with a wrestler box. A pair is eligible when the box holds at
+    least MIN_BOX_OVERLAP of the pose's visible landmarks; wrestlers' boxes usually overlap,
+    so eligible pairs are ranked by IoU between the pose's landmark extent and the box
+    (coverage breaks exact ties) rather than by landmarker output order, keeping ids stable.
+    Returns (pose_index, box_index) pairs.
+    """
+    if not pose_arrays or not boxes:
+        return []
+
+    landmarks = np.stack(pose_arrays)  # (P, 33, 4) full-frame normalized
+    box_array = np.asarray(boxes, dtype=np.float32)  # (B, 4) pixels
+    px = landmarks[:, :, 0] * width
+    py = landmarks[:, :, 1] * height
+    visible = landmarks[:, :, 3] > MATCH_VISIBILITY_THRESHOLD
+    inside = (
+        (px[:, None, :] >= box_array[None, :, 0, None]) & (px[:, None, :] <= box_array[None, :, 2, None]) &
+        (py[:, None, :] >= box_array[None, :, 1, None]) & (py[:, None, :] <= box_array[None, :, 3, None]) &
+        visible[:, None, :]
+    )
+    coverage = inside.sum(axis=2) / np.maximum(visible.sum(axis=1), 1)[:, None]  # (P, B)
+
+    # extent of each pose's visible landmarks, (P, 4) x1, y1, x2, y2
+    extents = np.stack([
+        np.where(visible, px, np.inf).min(axis=1), np.where(visible, py, np.inf).min(axis=1),
+        np.where(visible, px, -np.inf).max(axis=1), np.where(visible, py, -np.inf).max(axis=1),
+    ], axis=1)
+    # poses with no visible landmarks have infinite extents; their NaN IoU is zeroed below
+    with np.errstate(invalid="ignore"):
+        inter_w = np.clip(np.minimum(extents[:, None, 2], box_array[None, :, 2]) - np.maximum(extents[:, None, 0], box_array[None, :, 0]), 0, None)
+        inter_h = np.clip(np.minimum(extents[:, None, 3], box_array[None, :, 3]) - np.maximum(extents[:, None, 1], box_array[None, :, 1]), 0, None)
+        intersection = inter_w * inter_h
+        extent_area = np.clip(extents[:, 2] - extents[:, 0], 0, None) * np.clip(extents[:, 3] - extents[:, 1], 0, None)
+        box_area = (box_array[:, 2] - box_array[:, 0]) * (box_array[:, 3] - box_array[:, 1])
+        iou = intersection / np.maximum(extent_area[:, None] + box_area[None, :] - intersection, 1e-6)
+    iou = np.nan_to_num(iou)
+
+    scores = np.where(coverage >= MIN_BOX_OVERLAP, iou + coverage * 1e-3, -1.0)
+    matches = []
+    while scores.size and scores.max() >= 0:
+        pose_index, box_index = np.unravel_index(np.argmax(scores), scores.shape)
+        matches.append((int(pose_index), int(box_index)))
+        scores[pose_index, :] = -1
+        scores[:, box_index] = -1
+    return matches
+
+def to_crop_result(landmarks, box, width, height):
+    """Re-expresses full-frame landmarks in the crop-normalized form the Pose solution produces."""
+    x1, y1, x2, y2 = box
+    box_width = max(x2 - x1, 1)
+    box_height = max(y2 - y1, 1)
+    xs = (landmarks[:, 0] * width - x1) / box_width
+    ys = (landmarks[:, 1] * height - y1) / box_height
+    zs = landmarks[:, 2] * width / box_width
+    landmark = [
+        SimpleNamespace(x=float(x), y=float(y), z=float(z), visibility=float(v))
+        for x, y, z, v in zip(xs, ys, zs, landmarks[:, 3])
+    ]
+    return SimpleNamespace(pose_landmarks=SimpleNamespace(landmark=landmark))
+
+class MultiPoseEngine:
+    """
+    Runs one PoseLandmarker pass over the full frame (num_poses=MAX_WRESTLERS) instead of a
+    Pose graph per wrestler crop, then maps each pose back to a YOLO wrestler id.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, num_poses=media_pipe_handler.MAX_WRESTLERS, live_stream=False):
+        if not os.path.exists(model_path):
+            raise FileNotFoundError(f"PoseLandmarker model not found at {model_path}")
+        media_pipe_handler.load_mediapipe()
+        import mediapipe as mp
+        from mediapipe.tasks.python import BaseOptions
+        from mediapipe.tasks.python import vision
+
+        self._mp = mp
+        self._live_stream = live_stream
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._last_timestamp_ms = -1
+
+        options = vision.PoseLandmarkerOptions(
+            base_options=BaseOptions(model_asset_path=model_path),
+            running_mode=vision.RunningMode.LIVE_STREAM if live_stream else vision.RunningMode.VIDEO,
+            num_poses=num_poses,
+            result_callback=self._on_result if live_stream else None,
+        )
+        self._landmarker = vision.PoseLandmarker.create_from_options(options)
+
+    def _next_timestamp(self):
+        # The landmarker requires strictly increasing timestamps
+        timestamp_ms = max(int(time.monotonic() * 1000), self._last_timestamp_ms + 1)
+        self._last_timestamp_ms = timestamp_ms
+        return timestamp_ms
+
+    def process(self, frame, wrestler_frames):
+        timestamp_ms = self._next_timestamp()
+        image = self._mp.Image(image_format=self._mp.ImageFormat.SRGB, data=np.ascontiguousarray(frame))
+        wrestler_frames = wrestler_frames[:media_pipe_handler.MAX_WRESTLERS]
+
+        if self._live_stream:
+            with self._pending_lock:
+                self._pending[timestamp_ms] = (wrestler_frames, frame.shape)
+                while len(self._pending) > MAX_PENDING_FRAMES:
+                    self._pending.pop(next(iter(self._pending)))
+            self._landmarker.detect_async(image, timestamp_ms)
+            return
+
+        result = self._landmarker.detect_for_video(image, timestamp_ms)
+        self._record(result, wrestler_frames, frame.shape)
+
+    def _on_result(self, result, output_image, timestamp_ms):
+        with self._pending_lock:
+            pending = self._pending.pop(timestamp_ms, None)
+        if pending is not None:
+            self._record(result, *pending)
+
+    def _record(self, result, wrestler_frames, shape):
+        height, width = shape[:2]
+        pose_arrays = [
+            np.array([(lm.x, lm.y, lm.z, lm.visibility or 0.0) for lm in pose], dtype=np.float32)
+            for pose in result.pose_landmarks
+        ]
+        boxes = [wrestler["box"] for wrestler in wrestler_frames]
+
+        with media_pipe_handler.cache_lock:
+            for pose_index, box_index in match_poses_to_boxes(pose_arrays, boxes, width, height):
+                wrestler = wrestler_frames[box_index]
+                media_pipe_handler.record_pose_result(
+                    wrestler["id"],
+                    to_crop_result(pose_arrays[pose_index], wrestler["box"], width, height),
+                    label=wrestler.get("label"),
+                    box=wrestler["box"],
+                    confidence=wrestler.get("confidence"),
+                )
+            media_pipe_handler.finish_frame()
+
+    def warm_up(self):
+        blank = np.zeros((480, 640, 3), dtype=np.uint8)
+        self.process(blank, [])
+
+    def close(self):
+        self._landmarker.close()
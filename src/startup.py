@@ -0,0 +1,37 @@
+import time
+import threading
+
+# Imported first by main so the timeline starts as close to power-on as the interpreter allows.
+START_TIME = time.perf_counter()
+
+timeline = []
+timeline_lock = threading.Lock()
+
+def mark(event):
+    elapsed = time.perf_counter() - START_TIME
+    with timeline_lock:
+        timeline.append((elapsed, event))
+    print(f"[startup +{elapsed:6.2f}s] {event}")
+
+def warm_up_in_background(name, warm_up):
+    def run():
+        mark(f"{name} warm-up started")
+        try:
+            warm_up()
+        except Exception as e:
+            mark(f"{name} warm-up failed: {e}")
+            return
+        mark(f"{name} ready")
+
+    thread = threading.Thread(target=run, name=f"warm-up-{name}", daemon=True)
+    thread.start()
+    return thread
+
+def report(threads=()):
+    for thread in threads:
+        thread.join()
+    with timeline_lock:
+        events = sorted(timeline)
+    print("Startup timeline:")
+    for elapsed, event in events:
+        print(f"  +{elapsed:6.2f}s  {event}")
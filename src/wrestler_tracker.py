@@ -1,24 +1,51 @@
-from ultralytics import YOLO
 import cv2
-from camera import Camera
+import numpy as np
 import threading
 import media_pipe_handler
 import os
-
-model = YOLO("yolov8n.pt")
+import startup
+from display_renderer import DisplayRenderer
+
+MODEL_PATH = "yolov8n.pt"
+model = None
+model_lock = threading.Lock()
+# Ultralytics predictors are not thread-safe; warm-up and tracking take turns on the shared model
+inference_lock = threading.Lock()
 running = True
 frame_results = []
 frame_lock = threading.Lock()
 CONFIDENCE_THRESHOLD = 0.5
 MAX_WRESTLERS = 2
-WINDOW_NAME = "Wrestling Coach"
-fullscreen = False
-button_rects = {}
+DISPLAY_FPS = 15
+# HEADLESS=1 skips the local window; MJPEG_PORT=8080 serves the overlay at http://<host>:8080/stream.mjpg
+SHOW_WINDOW = not os.getenv("HEADLESS")
+MJPEG_PORT = int(os.getenv("MJPEG_PORT", "0")) or None
+renderer = None
+
+def get_model():
+    global model
+    if model is not None:
+        return model
+    # ultralytics and the weights load on first use so importing the tracker does not stall startup
+    with model_lock:
+        if model is None:
+            from ultralytics import YOLO
+            model = YOLO(MODEL_PATH)
+    return model
+
+def warm_up():
+    # predict (not track) so the warm-up frame does not seed the tracker state
+    yolo = get_model()
+    with inference_lock:
+        yolo.predict(np.zeros((480, 640, 3), dtype=np.uint8), classes=[0], verbose=False)
 
 def camera_stream_thread():
-    global frame_results, running
+    global frame_results, running, renderer
     frame = None
-    setup_window()
+    first_frame = True
+    renderer = DisplayRenderer(max_fps=DISPLAY_FPS, show_window=SHOW_WINDOW, mjpeg_port=MJPEG_PORT, on_quit=end_program).start()
+    # imported here so the detection helpers (and benchmark_pose) work without picamera2
+    from camera import Camera
     with Camera() as camera:
         while running:
             frame = camera.get_frame()
@@ -26,29 +53,11 @@ def camera_stream_thread():
                 people = detect_people(frame)
                 with frame_lock:
                     frame_results = people
-                media_pipe_handler.process_wrestler_frames(people)
-
-                display_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
-                media_pipe_handler.draw_pose_landmarks(display_frame, people)
-                draw_detections(display_frame, people)
-
-                cv2.imshow(WINDOW_NAME, display_frame)
-
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                end_program()
-
-def setup_window():
-    cv2.namedWindow(WINDOW_NAME, cv2.WINDOW_NORMAL)
-    cv2.resizeWindow(WINDOW_NAME, 960, 720)
-
-def toggle_fullscreen():
-    global fullscreen
-    fullscreen = not fullscreen
-    if fullscreen:
-        cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
-    else:
-        cv2.setWindowProperty(WINDOW_NAME, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
-        cv2.resizeWindow(WINDOW_NAME, 960, 720)
+                media_pipe_handler.process_frame(frame, people)
+                renderer.submit(frame, people)
+                if first_frame:
+                    first_frame = False
+                    startup.mark("first frame processed")
 
 def detect_people(frame):
     people = []
@@ -56,7 +65,9 @@ def detect_people(frame):
     yolo_frame = cv2.cvtColor(frame, cv2.COLOR_RGB2BGR)
 
     # YOLO tracking gives us stable IDs when possible; sorted fallback labels keep prompts deterministic.
-    results = model.track(yolo_frame, classes=[0], persist=True, verbose=False)
+    yolo = get_model()
+    with inference_lock:
+        results = yolo.track(yolo_frame, classes=[0], persist=True, verbose=False)
     boxes = results[0].boxes if results and results[0].boxes is not None else []
     for index, box in enumerate(boxes):
         cls = int(box.cls[0])
@@ -95,13 +106,6 @@ def detect_people(frame):
 
     return people[:MAX_WRESTLERS]
 
-def draw_detections(display_frame, people):
-    for person in people:
-        x1, y1, x2, y2 = person["box"]
-        label = f'{person["label"]} {person["confidence"]:.2f}'
-        cv2.rectangle(display_frame, (x1, y1), (x2, y2), (0, 220, 120), 2)
-        cv2.putText(display_frame, label, (x1, max(20, y1 - 8)), cv2.FONT_HERSHEY_SIMPLEX, 0.55, (0, 220, 120), 2)
-
 def end_program():
     global running
     running = False
@@ -113,5 +117,7 @@ def end_program():
         pass
 
     print("Stopping YOLO...")
+    if renderer is not None:
+        renderer.stop()
     cv2.destroyAllWindows()
     os._exit(0)